@@ -12,44 +12,61 @@ from mm_mpc.config import MPCConfig
 from mm_mpc.driver import run_driver_with_io
 
 def generate_random_graph(n, m, path):
-    edges = set()
-    while len(edges) < m:
-        u = np.random.randint(0, n)
-        v = np.random.randint(0, n)
-        if u != v:
-            u, v = min(u, v), max(u, v)
-            edges.add((u, v))
-            
-    with open(path, 'w') as f:
-        for u, v in edges:
-            f.write(f"{u} {v}\n")
-            
-def verify_matching(matching, input_path):
-    # Load original graph
-    adj = {}
-    with open(input_path, 'r') as f:
-        for line in f:
-            u, v = map(int, line.split())
-            if u not in adj: adj[u] = []
-            if v not in adj: adj[v] = []
-            adj[u].append(v)
-            adj[v].append(u)
-            
-    matched_verts = set()
-    for u, v in matching:
-        if u in matched_verts or v in matched_verts:
-            return False, f"Vertex in multiple edges: {u} or {v}"
-        matched_verts.add(u)
-        matched_verts.add(v)
-        
-    # Check maximality (simple check)
-    # Iterate all edges, check if at least one endpoint is matched
-    with open(input_path, 'r') as f:
-        for line in f:
-            u, v = map(int, line.split())
-            if u not in matched_verts and v not in matched_verts:
-                return False, f"Edge {u}-{v} is not covered"
-                
+    # Vectorized sampler: draw a batch of candidate pairs at once, drop
+    # self-loops, canonicalize (u < v) and dedup in C instead of the old
+    # one-edge-at-a-time Python rejection loop with a set.
+    # Edges are deduped as packed uint64 keys (lo << 32 | hi): a scalar
+    # np.unique is much cheaper than the row-wise axis=0 variant.
+    keys = np.empty(0, dtype=np.uint64)
+    batch = int(m * 1.3) + 16
+    while len(keys) < m:
+        cand = np.random.randint(0, n, size=(batch, 2)).astype(np.uint64)
+        cand = cand[cand[:, 0] != cand[:, 1]]
+        lo = np.minimum(cand[:, 0], cand[:, 1])
+        hi = np.maximum(cand[:, 0], cand[:, 1])
+        keys = np.unique(np.concatenate([keys, (lo << np.uint64(32)) | hi]))
+        batch *= 2
+    keys = keys[:m]
+    edges = np.column_stack((
+        (keys >> np.uint64(32)).astype(np.int64),
+        (keys & np.uint64(0xFFFFFFFF)).astype(np.int64)
+    ))
+
+    # One bulk write instead of one f.write per edge: cuts O(m) syscalls
+    # down to a single one. Pre-encoded bytes on a raw fd also skip the
+    # TextIOWrapper encode/buffer layer entirely.
+    payload = ("\n".join(f"{u} {v}" for u, v in edges) + "\n").encode("ascii")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
+    # Hand the in-memory array back so verification can reuse it
+    # instead of re-parsing the file it just wrote.
+    return edges
+
+def verify_matching(matching, edges):
+    # Vectorized checks: a bool lookup table replaces the Python
+    # set/dict walk over every edge.
+    E = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    M = np.asarray(matching, dtype=np.int64).reshape(-1, 2)
+
+    verts = M.ravel()
+    if np.unique(verts).size != verts.size:
+        return False, "Vertex appears in multiple matched edges"
+
+    max_id = int(E.max()) if len(E) else 0
+    if len(verts):
+        max_id = max(max_id, int(verts.max()))
+    matched = np.zeros(max_id + 1, dtype=bool)
+    matched[verts] = True
+
+    # Maximality: every edge must have at least one matched endpoint
+    uncovered = ~(matched[E[:, 0]] | matched[E[:, 1]])
+    if uncovered.any():
+        u, v = E[np.flatnonzero(uncovered)[0]]
+        return False, f"Edge {u}-{v} is not covered"
+
     return True, "OK"
 
 if __name__ == "__main__":
@@ -58,8 +75,9 @@ if __name__ == "__main__":
     
     # Create temp graph
     tmp_file = "test_graph.txt"
+    edges = None
     if rank == 0:
-        generate_random_graph(100, 500, tmp_file)
+        edges = generate_random_graph(100, 500, tmp_file)
     comm.Barrier()
     
     # Run Driver
@@ -77,7 +95,7 @@ if __name__ == "__main__":
         matching = run_driver_with_io(comm, config, tmp_file)
         
         if rank == 0:
-            valid, msg = verify_matching(matching, tmp_file)
+            valid, msg = verify_matching(matching, edges)
             if valid:
                 print("SUCCESS: Matching is valid and maximal.")
             else:
@@ -20,22 +20,35 @@ def main():
     parser.add_argument("--n", type=int, required=True, help="Num vertices")
     parser.add_argument("--m", type=int, required=True, help="Num edges")
     parser.add_argument("--alpha", type=float, default=0.2)
+    parser.add_argument("--alpha-list", default=None,
+                        help="Comma-separated alphas; sweeps all of them in one MPI session")
     parser.add_argument("--mem", type=float, default=1.0)
-    
+
     args = parser.parse_args()
-    
-    config = MPCConfig.from_args(
-        type('Args', (object,), {
-            'alpha': args.alpha,
-            'n_global': args.n,
-            'm_global': args.m,
-            'mem_per_cpu': args.mem
-        }), size
-    )
-    
+
+    # A sweep inside a single mpirun amortizes process spawn + MPI_Init
+    # across all alphas instead of paying it once per experiment.
+    if args.alpha_list:
+        alphas = [float(a) for a in args.alpha_list.split(",")]
+    else:
+        alphas = [args.alpha]
+
     hashing.init_seed(42)
-    
-    run_driver_with_io(comm, config, args.input)
+
+    for alpha in alphas:
+        config = MPCConfig.from_args(
+            type('Args', (object,), {
+                'alpha': alpha,
+                'n_global': args.n,
+                'm_global': args.m,
+                'mem_per_cpu': args.mem
+            }), size
+        )
+
+        if rank == 0 and len(alphas) > 1:
+            print(f"[Sweep] alpha={alpha}")
+
+        run_driver_with_io(comm, config, args.input)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,6 +1,20 @@
 import math
 import logging
 from dataclasses import dataclass
+from functools import lru_cache
+
+@lru_cache(maxsize=1024)
+def _derive_limits(n_global: int, alpha: float) -> tuple:
+    """Pure-math (S_edges, R_rounds) derivation, cached for sweeps that
+    reconstruct configs with the same (n, alpha) repeatedly."""
+    # Theoretical S = n^alpha
+    # Practical floor of 2000 prevents issues with tiny toy graphs
+    calculated_s = int(math.pow(n_global, alpha) * 1000)
+    s_edges = max(calculated_s, 2000)
+
+    # R = sqrt(log n)
+    r_rounds = max(2, int(math.sqrt(math.log(max(n_global, 10)))))
+    return s_edges, r_rounds
 
 @dataclass(frozen=True)
 class MPCConfig:
@@ -14,16 +28,15 @@ class MPCConfig:
     mem_hard_limit: float = 0.90
     small_threshold_factor: int = 100000
     random_seed: int = 42
+    # Approximate sampling: quantize the participation probability to the
+    # nearest power of two and test low hash bits instead of comparing
+    # magnitudes. Costs up to ~1 bit of sampling-rate precision; keep
+    # False when exact probabilities matter.
+    use_bit_sampling: bool = False
     
     @classmethod
     def from_args(cls, args, mpi_size: int) -> 'MPCConfig':
-        # Theoretical S = n^alpha
-        # Practical floor of 2000 prevents issues with tiny toy graphs
-        calculated_s = int(math.pow(args.n_global, args.alpha) * 1000)
-        s_edges = max(calculated_s, 2000)
-
-        # R = sqrt(log n)
-        r_rounds = max(2, int(math.sqrt(math.log(max(args.n_global, 10)))))
+        s_edges, r_rounds = _derive_limits(args.n_global, args.alpha)
 
         return cls(
             alpha=args.alpha,
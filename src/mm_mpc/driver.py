@@ -20,24 +20,42 @@ def run_driver_with_io(comm: MPI.Comm, config: MPCConfig, input_path: str):
     from .state_layout import init_vertex_state
     vertex_state = init_vertex_state(comm, edge_state)
     
-    total_matches = []
-    
+    # Per-phase match arrays, concatenated once at the end; avoids
+    # growing one Python list of tuples across every phase.
+    phase_arrays = []
+
     if rank == 0: 
         print(f"[Driver] Loaded. Edges: {len(local_edges)}")
     
+    # Cached active count: np.count_nonzero once up front, then kept in
+    # sync from integrate's prune counts instead of rescanning the mask.
+    n_active = np.count_nonzero(edge_state.active_mask)
+
+    # Reusable buffers for the nonblocking active-count reduction.
+    # The reduction for phase p+1 is posted as soon as integrate updates
+    # the local count in phase p, so it rides behind the entire phase
+    # body instead of acting as a per-phase barrier.
+    _active_send = np.empty(1, dtype=np.int64)
+    _active_recv = np.empty(1, dtype=np.int64)
+
+    _active_send[0] = n_active
+    req = comm.Iallreduce(_active_send, _active_recv, op=MPI.SUM)
+
     for phase in range(12):
-        n_active = np.sum(edge_state.active_mask)
-        global_active = comm.allreduce(n_active, op=MPI.SUM)
-        
-        if rank == 0: 
+        # 1. Sparsify (local part overlaps the in-flight reduction)
+        p_val = 0.5
+        part = sparsify.compute_phase_participation(edge_state, phase, 0, p_val,
+                                                    use_bit_sampling=config.use_bit_sampling)
+
+        req.Wait()
+        global_active = int(_active_recv[0])
+
+        if rank == 0:
             print(f"=== Phase {phase} | Active: {global_active} ===")
-            
-        if global_active == 0: 
+
+        if global_active == 0:
             break
-            
-        # 1. Sparsify
-        p_val = 0.5 
-        part = sparsify.compute_phase_participation(edge_state, phase, 0, p_val)
+
         sparsify.compute_deg_in_sparse(comm, edge_state, vertex_state, part, size)
         
         # 2. Stall
@@ -50,18 +68,42 @@ def run_driver_with_io(comm: MPI.Comm, config: MPCConfig, input_path: str):
         chosen = local_mis.run_greedy_mis(edge_state, phase, participating_mask=part)
         
         # 5. Integrate
-        new_m = integrate.update_matching_and_prune(comm, edge_state, vertex_state, chosen, size)
-        total_matches.extend(new_m)
+        new_m, n_pruned = integrate.update_matching_and_prune(comm, edge_state, vertex_state, chosen, size)
+        if len(new_m):
+            phase_arrays.append(np.asarray(new_m, dtype=np.int64).reshape(-1, 2))
+        n_active -= n_pruned
+
+        # Kick off the next phase's termination check immediately
+        if phase < 11:
+            _active_send[0] = n_active
+            req = comm.Iallreduce(_active_send, _active_recv, op=MPI.SUM)
         
     extra = finish.finish_small_components(comm, edge_state, vertex_state, config)
-    total_matches.extend(extra)
-    
-    all_lists = comm.gather(total_matches, root=0)
+    if len(extra):
+        phase_arrays.append(np.asarray(extra, dtype=np.int64).reshape(-1, 2))
+
+    local_matches = (np.concatenate(phase_arrays, axis=0) if phase_arrays
+                     else np.empty((0, 2), dtype=np.int64))
+
+    # Gather the final matching as a flat int64 buffer (Gatherv) instead
+    # of pickling per-rank lists of tuples through comm.gather.
+    send_data = local_matches.reshape(-1)
+    send_count = np.array([len(send_data)], dtype=np.int32)
+    recv_counts = np.empty(size, dtype=np.int32) if rank == 0 else None
+
+    comm.Gather(send_count, recv_counts, root=0)
+
+    recv_buf = None
+    displs = None
+    if rank == 0:
+        displs = np.concatenate(([0], np.cumsum(recv_counts)[:-1]))
+        recv_buf = np.empty(np.sum(recv_counts), dtype=np.int64)
+
+    comm.Gatherv([send_data, MPI.INT64_T], [recv_buf, recv_counts, displs, MPI.INT64_T], root=0)
+
     final_matching = []
-    
     if rank == 0:
-        for l in all_lists: 
-            final_matching.extend(l)
+        final_matching = [tuple(e) for e in recv_buf.reshape((-1, 2))]
         print(f"Done. Matching Size: {len(final_matching)}")
-        
+
     return final_matching
\ No newline at end of file
@@ -1,35 +1,153 @@
+import os
 import sys
+import hashlib
 import numpy as np
 from mpi4py import MPI
-from typing import Tuple, List
+from typing import Tuple
 from .utils import hashing
 
+_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'mm_mpc')
+
+def _cache_path(filepath: str) -> str:
+    """Cache filename keyed on absolute path + mtime + size, so edits to
+    the input invalidate the cached parse automatically."""
+    st = os.stat(filepath)
+    key = f"{os.path.abspath(filepath)}:{st.st_mtime_ns}:{st.st_size}"
+    return os.path.join(_CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + '.npy')
+
+def read_edge_array(filepath: str) -> np.ndarray:
+    """
+    Reads an edge list into an (m, 2) int64 array.
+    '.npy' files are the binary fast path (no text tokenization);
+    anything else is parsed as a whitespace-separated text edge list.
+    Text parses are cached as '.npy' under ~/.cache/mm_mpc so repeat
+    runs on the same input memory-map the binary form instead of
+    re-tokenizing ASCII.
+    """
+    if filepath.endswith('.npy'):
+        return np.load(filepath).astype(np.int64, copy=False).reshape(-1, 2)
+
+    cache = _cache_path(filepath)
+    if os.path.exists(cache):
+        return np.load(cache, mmap_mode='r')
+
+    # np.loadtxt tokenizes in C -- no per-line Python int() parsing.
+    arr = np.loadtxt(filepath, dtype=np.int64, comments='#',
+                     usecols=(0, 1), ndmin=2)
+
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        tmp = cache + f'.tmp{os.getpid()}.npy'  # .npy suffix: keep np.save from renaming
+        np.save(tmp, arr)
+        os.replace(tmp, cache)
+    except OSError:
+        pass  # caching is best-effort; an unwritable cache dir is fine
+
+    return arr
+
+# Generous bound on one text line ("u v\n" for two int64s)
+_MAX_LINE_BYTES = 4096
+
+def _slice_bounds(fsize: int, rank: int, size: int) -> Tuple[int, int, int, int]:
+    """Byte window (base, start, end, read_end) for one rank's slice of
+    an fsize-byte file. The rank owns the lines whose first byte falls
+    in [start, end); it reads [base, read_end) so it can see whether
+    `start` begins a line and complete the line spanning `end`. base is
+    clamped at 0: when fsize < size, chunk is 0 and every rank's slice
+    starts at 0 -- a negative offset would hang the collective read."""
+    chunk = fsize // size
+    start = rank * chunk
+    end = fsize if rank == size - 1 else (rank + 1) * chunk
+    base = max(start - 1, 0)
+    read_end = min(fsize, end + _MAX_LINE_BYTES)
+    return base, start, end, read_end
+
+def _trim_owned_lines(data: bytes, base: int, start: int, end: int) -> bytes:
+    """Trims the raw window read at offset `base` down to exactly the
+    lines whose first byte falls in [start, end)."""
+    lo = 0
+    if base < start:
+        # Skip the tail of the line owned by the previous rank
+        nl = data.find(b'\n')
+        lo = nl + 1 if nl >= 0 else len(data)
+    # A slice that falls entirely inside one line owns nothing; without
+    # this guard the cut below would grab the next rank's line and
+    # duplicate it.
+    if base + lo >= end:
+        return b""
+    # Drop lines starting at or past `end`: cut just after the first
+    # newline at file offset >= end - 1.
+    cut = data.find(b'\n', max(lo, end - 1 - base))
+    hi = cut + 1 if cut >= 0 else len(data)
+    return data[lo:hi]
+
+def _load_parallel_text(comm: MPI.Comm, filepath: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Collective load path: every rank reads an aligned byte slice of the
+    text edge list via MPI.File, parses it locally and routes edges to
+    their owners with one exchange. Rank 0 never materializes the whole
+    graph, so load time scales with ranks instead of rank-0 bandwidth.
+    """
+    import io
+    from .utils import mpi_helpers
+
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    fh = MPI.File.Open(comm, filepath, MPI.MODE_RDONLY)
+    fsize = fh.Get_size()
+
+    base, start, end, read_end = _slice_bounds(fsize, rank, size)
+    buf = bytearray(read_end - base)
+    fh.Read_at_all(base, buf)
+    fh.Close()
+
+    data = _trim_owned_lines(bytes(buf), base, start, end)
+
+    edges = np.loadtxt(io.BytesIO(data), dtype=np.int64, comments='#',
+                       usecols=(0, 1), ndmin=2) if data.strip() else np.empty((0, 2), dtype=np.int64)
+
+    owners = hashing.get_edge_owner_vec(edges[:, 0], edges[:, 1], size)
+    order = np.argsort(owners, kind='stable')
+    counts = np.bincount(owners, minlength=size)
+    sorted_flat = np.ascontiguousarray(edges[order]).reshape(-1)
+
+    # Slice the sorted payload per destination rank and exchange
+    bounds = np.concatenate(([0], np.cumsum(2 * counts)))
+    send_bufs = [sorted_flat[bounds[r]:bounds[r + 1]] for r in range(size)]
+    recv = mpi_helpers.exchange_buffers(comm, send_bufs, dtype=np.int64)
+
+    local_edges = np.concatenate(recv).reshape((-1, 2)) if recv else np.empty((0, 2), dtype=np.int64)
+    local_ids = hashing.get_edge_id_vec(local_edges[:, 0], local_edges[:, 1])
+    return local_edges, local_ids
+
 def load_and_distribute_graph(comm: MPI.Comm, filepath: str) -> Tuple[np.ndarray, np.ndarray]:
     rank = comm.Get_rank()
     size = comm.Get_size()
-    
+
+    # Text inputs on multi-rank runs take the collective MPI-IO path;
+    # '.npy' inputs (and single-rank runs) keep the rank-0 load.
+    if size > 1 and not filepath.endswith('.npy'):
+        if rank == 0:
+            print(f"[IO] Loading {filepath} (parallel)...")
+        return _load_parallel_text(comm, filepath)
+
     send_counts = None
     send_data = None
     displs = None
-    
+
     if rank == 0:
         print(f"[IO] Loading {filepath}...")
-        buckets: List[List[int]] = [[] for _ in range(size)]
         try:
-            with open(filepath, 'r') as f:
-                for line in f:
-                    if line.startswith('#') or not line.strip(): continue
-                    parts = line.split()
-                    if len(parts) < 2: continue
-                    u, v = int(parts[0]), int(parts[1])
-                    owner = hashing.get_edge_owner(u, v, size)
-                    buckets[owner].extend([u, v])
-            
-            counts_list = [len(b) for b in buckets]
-            send_counts = np.array(counts_list, dtype=np.int32)
+            edges = read_edge_array(filepath)
+            owners = hashing.get_edge_owner_vec(edges[:, 0], edges[:, 1], size)
+            # One-pass radix bucketing: a stable sort by owner yields the
+            # per-rank send order, bincount the per-rank counts. No
+            # Python lists, no per-edge appends.
+            order = np.argsort(owners, kind='stable')
+            send_counts = (2 * np.bincount(owners, minlength=size)).astype(np.int32)
             displs = np.concatenate(([0], np.cumsum(send_counts)[:-1])).astype(np.int32)
-            flat_buckets = [np.array(b, dtype=np.int64) for b in buckets]
-            send_data = np.concatenate(flat_buckets) if flat_buckets else np.array([], dtype=np.int64)
+            send_data = np.ascontiguousarray(edges[order]).reshape(-1)
         except Exception as e:
             print(f"[IO] Error: {e}")
             comm.Abort(1)
@@ -42,8 +160,6 @@ def load_and_distribute_graph(comm: MPI.Comm, filepath: str) -> Tuple[np.ndarray
     m_local = my_count_buf[0] // 2
     local_edges = recv_buffer.reshape((m_local, 2))
     
-    local_ids = np.empty(m_local, dtype=np.int64)
-    for i in range(m_local):
-        local_ids[i] = hashing.get_edge_id(local_edges[i,0], local_edges[i,1])
-        
+    local_ids = hashing.get_edge_id_vec(local_edges[:, 0], local_edges[:, 1])
+
     return local_edges, local_ids
\ No newline at end of file
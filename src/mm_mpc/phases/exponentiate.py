@@ -6,19 +6,28 @@ Grows neighborhoods (balls) by R steps using linear-time merging.
 
 import numpy as np
 from mpi4py import MPI
-from collections import defaultdict
 from typing import Optional
-from ..state_layout import EdgeState
+from ..state_layout import EdgeState, ensure_owner_cache
 from ..config import MPCConfig
 from ..utils import mpi_helpers, hashing
 
 def merge_sorted_unique(arr1: np.ndarray, arr2: np.ndarray) -> np.ndarray:
     """
-    Merges two sorted unique arrays into a sorted unique array.
-    Currently uses np.union1d (O(N log N)). 
-    In production C++/Cython, this would be a linear O(N) scan.
+    Merges two sorted unique arrays into a sorted unique array in O(N+M):
+    searchsorted finds each arr2 element's slot (binary search on the
+    shorter side is cheap), np.insert splices with one memmove, and a
+    neighbor-diff pass drops cross-array duplicates. No re-sort of the
+    combined array, unlike np.union1d.
     """
-    return np.union1d(arr1, arr2)
+    if len(arr1) == 0:
+        return arr2
+    if len(arr2) == 0:
+        return arr1
+    merged = np.insert(arr1, np.searchsorted(arr1, arr2), arr2)
+    keep = np.empty(len(merged), dtype=bool)
+    keep[0] = True
+    np.not_equal(merged[1:], merged[:-1], out=keep[1:])
+    return merged[keep]
 
 def build_balls(
     comm: MPI.Comm, 
@@ -34,25 +43,72 @@ def build_balls(
     candidates = edge_state.active_mask & ~edge_state.stalled
     if participating_mask is not None:
         candidates &= participating_mask
-    active_indices = np.where(candidates)[0]
-    
-    # Current state of balls: dict mapping local_index -> np.array(eids)
-    current_balls = {idx: np.array([edge_state.edge_ids[idx]], dtype=np.int64) for idx in active_indices}
+    active_indices = np.flatnonzero(candidates)
     
+    # Current state of balls in CSR (SoA) form: slot k holds the sorted
+    # unique ball of active_indices[k] in ball_vals[ball_offs[k]:
+    # ball_offs[k+1]]. Two flat arrays replace a dict of thousands of
+    # tiny ndarrays, and the per-round merge becomes one global sort.
+    m_local = len(edge_state.edges_local)
+    n_act = len(active_indices)
+    slot_of_idx = np.full(m_local, -1, dtype=np.int64)
+    slot_of_idx[active_indices] = np.arange(n_act, dtype=np.int64)
+    ball_offs = np.arange(n_act + 1, dtype=np.int64)   # every ball starts as {own eid}
+    ball_vals = edge_state.edge_ids[active_indices].copy()
+
+    # Sorted id index for the merge step: one searchsorted per reply
+    # buffer replaces a dict probe per incoming eid.
+    eid_order = np.argsort(edge_state.edge_ids, kind='stable')
+    eid_sorted = edge_state.edge_ids[eid_order]
+
+    # Endpoint owners are pure hash functions of the vertex ids -- cache
+    # them on the state the first time and reuse across rounds/phases.
+    ensure_owner_cache(edge_state, size)
+
+    # Round-invariant slices for the active set
+    us = edge_state.u[active_indices]
+    vs = edge_state.v[active_indices]
+    eids = edge_state.edge_ids[active_indices]
+    owners_u = edge_state.owner_u[active_indices]
+    owners_v = edge_state.owner_v[active_indices]
+
     # --- R-Round Loop ---
     for step in range(config.R_rounds):
         # 1. Send to Vertices
-        send_bufs = [[] for _ in range(size)]
-        for idx, ball in current_balls.items():
-            u, v = edge_state.edges_local[idx]
-            eid = edge_state.edge_ids[idx]
-            blen = len(ball)
-            
-            for target in [u, v]:
-                owner = hashing.get_vertex_owner(target, size)
-                send_bufs[owner].extend([target, eid, blen])
-                send_bufs[owner].extend(ball)
-                
+        # Per-rank totals are computed up front (bincount over message
+        # lengths) so each buffer is allocated once and filled through a
+        # write cursor -- no Python list growth per edge.
+        blens = np.diff(ball_offs)
+
+        # Sectioned wire format, decodable without a per-message scan:
+        #   [K, len_1..len_K, (tv, eid) x K, payload_1..payload_K]
+        msg_counts = (np.bincount(owners_u, minlength=size)
+                      + np.bincount(owners_v, minlength=size)).astype(np.int64)
+        pay_totals = (np.bincount(owners_u, weights=blens, minlength=size)
+                      + np.bincount(owners_v, weights=blens, minlength=size)).astype(np.int64)
+        send_bufs = [np.empty(1 + 3 * k + p, dtype=np.int64)
+                     for k, p in zip(msg_counts, pay_totals)]
+        for r in range(size):
+            send_bufs[r][0] = msg_counts[r]
+        hdr_base = 1 + msg_counts          # start of the (tv, eid) section
+        pay_base = 1 + 3 * msg_counts      # start of the payload section
+        mcur = np.zeros(size, dtype=np.int64)
+        pcur = np.zeros(size, dtype=np.int64)
+
+        for k in range(n_act):
+            ball = ball_vals[ball_offs[k] : ball_offs[k + 1]]
+            blen = blens[k]
+            for target, owner in ((us[k], owners_u[k]), (vs[k], owners_v[k])):
+                buf = send_bufs[owner]
+                m = mcur[owner]
+                p = pcur[owner]
+                buf[1 + m] = blen
+                buf[hdr_base[owner] + 2 * m] = target
+                buf[hdr_base[owner] + 2 * m + 1] = eids[k]
+                buf[pay_base[owner] + p : pay_base[owner] + p + blen] = ball
+                mcur[owner] = m + 1
+                pcur[owner] = p + blen
+
         recv_data = mpi_helpers.exchange_buffers(comm, send_bufs, dtype=np.int64)
         
         # 2. Vertex Aggregation (Using VertexState)
@@ -65,96 +121,179 @@ def build_balls(
         # Yes. But `adj_storage` stores local edge indices.
         # We need to check if those edges are participating.
         
-        v_inbox = defaultdict(list)
-        v_subscribers = defaultdict(list)
-        
+        # Decode the sectioned format in bulk: lengths, headers and
+        # payloads are contiguous slices, so tagging every payload
+        # element with its vertex is a single np.repeat per sender
+        # instead of a per-message cursor walk.
+        tagged_vs = []
+        chunks = []
+        tvs_parts = []
+        seids_parts = []
+
         for r_buf in recv_data:
-            cursor = 0
-            n = len(r_buf)
-            while cursor < n:
-                tv, seid, length = r_buf[cursor], r_buf[cursor+1], r_buf[cursor+2]
-                cursor += 3
-                # We own tv (guaranteed by routing), so we process it.
-                # Even if we don't have local edges incident to it.
-                v_inbox[tv].append(r_buf[cursor : cursor+length])
-                v_subscribers[tv].append(seid)
-                cursor += length
-                
-        # 3. Reply to Edges
-        reply_bufs = [[] for _ in range(size)]
-        
-        for v, balls in v_inbox.items():
-            incident_eids = []
-            
-            # Gather incident edges from CSR (if we have any)
+            if len(r_buf) == 0:
+                continue
+            k_msgs = int(r_buf[0])
+            lens = r_buf[1 : 1 + k_msgs]
+            hdr = r_buf[1 + k_msgs : 1 + 3 * k_msgs]
+            tvs = hdr[0::2]
+            seids = hdr[1::2]
+            payload = r_buf[1 + 3 * k_msgs:]
+            if len(payload):
+                tagged_vs.append(np.repeat(tvs, lens))
+                chunks.append(payload)
+            # We own every tv (guaranteed by routing), so we process it
+            # even without local edges incident to it.
+            tvs_parts.append(tvs)
+            seids_parts.append(seids)
+
+        # Group subscribers by vertex with one stable argsort instead of
+        # a defaultdict append per message: each vertex's subscriber
+        # eids become a contiguous slice of seids_s.
+        if tvs_parts:
+            all_tvs = np.concatenate(tvs_parts)
+            all_seids = np.concatenate(seids_parts)
+        else:
+            all_tvs = np.empty(0, dtype=np.int64)
+            all_seids = np.empty(0, dtype=np.int64)
+        sub_order = np.argsort(all_tvs, kind='stable')
+        seids_s = all_seids[sub_order]
+        uniq_sub_v, sub_counts = np.unique(all_tvs[sub_order], return_counts=True)
+
+        # Incident participating edges join each vertex's pool as one
+        # more tagged chunk.
+        for v in uniq_sub_v:
             if v in vertex_state.vertex_id_to_row:
                 row_idx = vertex_state.vertex_id_to_row[v]
                 start = vertex_state.adj_offsets[row_idx]
                 end = vertex_state.adj_offsets[row_idx+1]
                 local_incident_indices = vertex_state.adj_storage[start:end]
-                
+
+                incident_eids = []
                 for local_idx in local_incident_indices:
                     # Check if this edge is participating in this phase
-                    is_participating = False
                     if participating_mask is not None:
-                        if participating_mask[local_idx]:
-                            is_participating = True
+                        is_participating = participating_mask[local_idx]
                     else:
-                        if edge_state.active_mask[local_idx] and not edge_state.stalled[local_idx]:
-                            is_participating = True
-                            
+                        is_participating = (edge_state.active_mask[local_idx]
+                                            and not edge_state.stalled[local_idx])
                     if is_participating:
                         incident_eids.append(edge_state.edge_ids[local_idx])
-            
-            incident_eids_arr = np.array(incident_eids, dtype=np.int64)
-            
-            # Merge incoming balls + incident edges
-            if not balls:
-                super_b = incident_eids_arr
-            else:
-                # Optimization: concat then unique
-                # We unite all incoming balls AND the incident edges
-                combined = balls + [incident_eids_arr]
-                super_b = np.unique(np.concatenate(combined))
-            
-            sblen = len(super_b)
-            for eid in v_subscribers[v]:
-                dest = hashing.get_edge_owner_from_id(eid, size)
-                reply_bufs[dest].extend([eid, sblen])
-                reply_bufs[dest].extend(super_b)
-                
+
+                if incident_eids:
+                    arr = np.array(incident_eids, dtype=np.int64)
+                    tagged_vs.append(np.full(len(arr), v, dtype=np.int64))
+                    chunks.append(arr)
+
+        # One lexsort over every (vertex, eid) pair replaces the per-
+        # vertex unique(concatenate(...)) kernels: dedup is a neighbor
+        # compare and each super-ball is a contiguous sorted slice.
+        super_balls = {}
+        if chunks:
+            all_vs = np.concatenate(tagged_vs)
+            all_balls = np.concatenate(chunks)
+            order = np.lexsort((all_balls, all_vs))
+            sv = all_vs[order]
+            sb = all_balls[order]
+            keep = np.empty(len(sv), dtype=bool)
+            keep[0] = True
+            keep[1:] = (sv[1:] != sv[:-1]) | (sb[1:] != sb[:-1])
+            sv = sv[keep]
+            sb = sb[keep]
+            uniq_v, first = np.unique(sv, return_index=True)
+            ends = np.append(first[1:], len(sv))
+            for v, s, e in zip(uniq_v, first, ends):
+                super_balls[int(v)] = sb[s:e]
+
+        # 3. Reply to Edges (same preallocate-and-cursor scheme).
+        # seids_s is already grouped by vertex, so the per-message ball
+        # list is one repeat of each vertex's super-ball.
+        _empty_ball = np.empty(0, dtype=np.int64)
+        sub_eids_arr = seids_s
+        sub_balls = []
+        for v, count in zip(uniq_sub_v, sub_counts):
+            super_b = super_balls.get(int(v), _empty_ball)
+            sub_balls.extend([super_b] * count)
+
+        sblens = np.fromiter(map(len, sub_balls), dtype=np.int64, count=len(sub_balls))
+        dests = hashing.get_edge_owner_from_id_vec(sub_eids_arr, size)
+
+        # Sectioned reply format: [K, len_1..len_K, eid_1..eid_K, payloads]
+        rep_counts = np.bincount(dests, minlength=size).astype(np.int64)
+        rep_pay = np.bincount(dests, weights=sblens, minlength=size).astype(np.int64)
+        reply_bufs = [np.empty(1 + 2 * k + p, dtype=np.int64)
+                      for k, p in zip(rep_counts, rep_pay)]
+        for r in range(size):
+            reply_bufs[r][0] = rep_counts[r]
+        eid_base = 1 + rep_counts
+        pay_base = 1 + 2 * rep_counts
+        mcur = np.zeros(size, dtype=np.int64)
+        pcur = np.zeros(size, dtype=np.int64)
+
+        for k in range(len(sub_balls)):
+            d = dests[k]
+            buf = reply_bufs[d]
+            m = mcur[d]
+            p = pcur[d]
+            sblen = sblens[k]
+            buf[1 + m] = sblen
+            buf[eid_base[d] + m] = sub_eids_arr[k]
+            buf[pay_base[d] + p : pay_base[d] + p + sblen] = sub_balls[k]
+            mcur[d] = m + 1
+            pcur[d] = p + sblen
+
         recv_replies = mpi_helpers.exchange_buffers(comm, reply_bufs, dtype=np.int64)
-        
+
         # 4. Merge Updates
-        lookup = edge_state.id_to_index
+        # Every incoming payload element is tagged with its target slot;
+        # the current CSR values join the pool pre-tagged, then a single
+        # lexsort + neighbor dedup rebuilds all balls for the round. No
+        # per-edge merge calls at all.
+        tag_parts = [np.repeat(np.arange(n_act, dtype=np.int64), blens)]
+        val_parts = [ball_vals]
+
         for r_buf in recv_replies:
-            cursor = 0
-            n = len(r_buf)
-            while cursor < n:
-                teid, length = r_buf[cursor], r_buf[cursor+1]
-                cursor += 2
-                inc = r_buf[cursor : cursor+length]
-                cursor += length
-                
-                if teid in lookup:
-                    idx = lookup[teid]
-                    # Use the helper function here
-                    new_ball = merge_sorted_unique(current_balls[idx], inc)
-                    
-                    if len(new_ball) > config.S_edges:
-                        raise MemoryError(f"Rank {rank}: Ball size {len(new_ball)} exceeded {config.S_edges}")
-                    current_balls[idx] = new_ball
+            if len(r_buf) == 0:
+                continue
+            k_msgs = int(r_buf[0])
+            lens = r_buf[1 : 1 + k_msgs]
+            teids = r_buf[1 + k_msgs : 1 + 2 * k_msgs]
+            payload = r_buf[1 + 2 * k_msgs:]
+
+            # Vectorized id lookup: one binary search over all incoming
+            # eids instead of a dict membership test per message.
+            pos = np.searchsorted(eid_sorted, teids)
+            safe = np.minimum(pos, max(len(eid_sorted) - 1, 0))
+            slots = slot_of_idx[eid_order[safe]]
+            known = (pos < len(eid_sorted)) & (eid_sorted[safe] == teids) & (slots >= 0)
+
+            if known.any():
+                tag_parts.append(np.repeat(slots[known], lens[known]))
+                val_parts.append(payload[np.repeat(known, lens)])
+
+        tags = np.concatenate(tag_parts)
+        vals = np.concatenate(val_parts)
+        order = np.lexsort((vals, tags))
+        st = tags[order]
+        sv = vals[order]
+        keep = np.empty(len(st), dtype=bool)
+        if len(keep):
+            keep[0] = True
+            keep[1:] = (st[1:] != st[:-1]) | (sv[1:] != sv[:-1])
+        new_tags = st[keep]
+        ball_vals = np.ascontiguousarray(sv[keep])
+
+        counts = np.bincount(new_tags, minlength=n_act)
+        if len(counts) and counts.max() > config.S_edges:
+            raise MemoryError(f"Rank {rank}: Ball size {int(counts.max())} exceeded {config.S_edges}")
+        ball_offs = np.concatenate(([0], np.cumsum(counts)))
 
     # --- Finalize State ---
-    m = len(edge_state.edges_local)
-    edge_state.ball_offsets[:] = 0
-    lengths = np.zeros(m, dtype=np.int64)
-    for idx, ball in current_balls.items(): 
-        lengths[idx] = len(ball)
+    # Slots are in ascending local-index order, so the CSR value array
+    # is already the storage layout; only the offsets need expanding
+    # from the active set to all m edges.
+    lengths = np.zeros(m_local, dtype=np.int64)
+    lengths[active_indices] = np.diff(ball_offs)
+    edge_state.ball_offsets[0] = 0
     np.cumsum(lengths, out=edge_state.ball_offsets[1:])
-    
-    total = edge_state.ball_offsets[-1]
-    edge_state.ball_storage = np.zeros(total, dtype=np.int64)
-    for idx, ball in current_balls.items():
-        start = edge_state.ball_offsets[idx]
-        edge_state.ball_storage[start : start+len(ball)] = ball
\ No newline at end of file
+    edge_state.ball_storage = ball_vals
\ No newline at end of file
@@ -10,14 +10,46 @@ from ..state_layout import EdgeState
 from ..config import MPCConfig
 
 def solve_sequential_greedy(edges: np.ndarray) -> list:
-    matching = []
-    matched_verts = set()
-    for u, v in edges:
-        if u not in matched_verts and v not in matched_verts:
-            matched_verts.add(u)
-            matched_verts.add(v)
-            matching.append((u, v))
-    return matching
+    """
+    Greedy maximal matching on a gathered edge array. Vertex ids are
+    compressed to a dense range so matched-ness is one bool array probe
+    per endpoint instead of Python set hashing on boxed int64s.
+    """
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    if len(edges) == 0:
+        return []
+
+    uniq, inv = np.unique(edges, return_inverse=True)
+    inv = inv.reshape(-1, 2)
+    n = len(uniq)
+    matched = np.zeros(n, dtype=bool)
+
+    # Batched passes, equivalent to the sequential scan: an edge is
+    # safe to take when it is the first surviving occurrence of both
+    # endpoints (no earlier edge can claim them). Each pass matches all
+    # safe edges at once, drops newly covered edges, and repeats --
+    # typically a handful of vectorized passes instead of a per-edge
+    # Python loop.
+    iu = inv[:, 0]
+    iv = inv[:, 1]
+    alive = np.arange(len(inv), dtype=np.int64)
+    chosen_parts = []
+    while len(alive):
+        u = iu[alive]
+        v = iv[alive]
+        pos = np.arange(len(alive), dtype=np.int64)
+        first = np.full(n, len(alive), dtype=np.int64)
+        np.minimum.at(first, u, pos)
+        np.minimum.at(first, v, pos)
+        pick = (first[u] == pos) & (first[v] == pos)
+
+        chosen_parts.append(alive[pick])
+        matched[u[pick]] = True
+        matched[v[pick]] = True
+        alive = alive[~pick & ~matched[u] & ~matched[v]]
+
+    order = np.sort(np.concatenate(chosen_parts)) if chosen_parts else []
+    return [(edges[i, 0], edges[i, 1]) for i in order]
 
 def finish_small_components(
     comm: MPI.Comm,
@@ -29,9 +61,15 @@ def finish_small_components(
     size = comm.Get_size()
     
     # 1. Check Global Size
-    active_indices = np.where(edge_state.active_mask)[0]
-    local_count = len(active_indices)
-    global_count = comm.allreduce(local_count, op=MPI.SUM)
+    # One Allgather gives every rank the global count for the
+    # termination/threshold check -- no separate Allreduce plus rank-0
+    # Gather round trip. send_count is reused by the staged gathers
+    # below.
+    n_local_active = int(np.count_nonzero(edge_state.active_mask))
+    send_count = np.array([2 * n_local_active], dtype=np.int32)
+    recv_counts = np.empty(size, dtype=np.int32)
+    comm.Allgather(send_count, recv_counts)
+    global_count = int(recv_counts.sum()) // 2
     
     if global_count == 0:
         return []
@@ -76,36 +114,74 @@ def finish_small_components(
             chosen = local_mis.run_greedy_mis(edge_state, phase=999+i, participating_mask=None)
             
             # 3. Integrate
-            new_m = integrate.update_matching_and_prune(comm, edge_state, vertex_state, chosen, size)
+            new_m, _ = integrate.update_matching_and_prune(comm, edge_state, vertex_state, chosen, size)
             extra_matches.extend(new_m)
-            
-            # Check if done
-            n_active = np.sum(edge_state.active_mask)
-            g_active = comm.allreduce(n_active, op=MPI.SUM)
-            if g_active == 0:
+
+            # Check if done (buffered Allreduce)
+            _count_send = np.array([np.count_nonzero(edge_state.active_mask)], dtype=np.int64)
+            _count_recv = np.empty(1, dtype=np.int64)
+            comm.Allreduce(_count_send, _count_recv, op=MPI.SUM)
+            if int(_count_recv[0]) == 0:
                 break
                 
         return extra_matches
 
     # 2. Gather active edges
-    my_edges = edge_state.edges_local[active_indices]
-    
-    send_data = my_edges.flatten().astype(np.int64)
-    send_count = np.array([len(send_data)], dtype=np.int32)
-    recv_counts = np.zeros(comm.Get_size(), dtype=np.int32)
-    
-    comm.Gather(send_count, recv_counts, root=0)
-    
+    # Boolean-mask indexing yields a C-contiguous int64 copy directly
+    # (no index materialization), so reshape(-1) is a view -- no
+    # flatten()/astype() second copy.
+    my_edges = edge_state.edges_local[edge_state.active_mask]
+
+    send_data = my_edges.reshape(-1)
+    if not send_data.flags['C_CONTIGUOUS'] or send_data.dtype != np.int64:
+        send_data = np.ascontiguousarray(send_data, dtype=np.int64)
+
+    # Hierarchical gather: everyone gathers to its node leader over the
+    # shared-memory communicator first, then only the leaders Gatherv
+    # into global rank 0. This caps the number of concurrent network
+    # senders at the node count instead of P, avoiding the rank-0 incast
+    # on multi-node runs; on a single node stage 2 degenerates to a
+    # no-op self-gather. Roots at both stages use MPI.IN_PLACE with
+    # their contribution pre-placed at displacement 0.
+    node_comm = comm.Split_type(MPI.COMM_TYPE_SHARED)
+    is_leader = node_comm.Get_rank() == 0
+    # Split_type keys by rank, so global rank 0 leads its node and
+    # lands at leaders_comm rank 0.
+    leaders_comm = comm.Split(0 if is_leader else MPI.UNDEFINED, rank)
+
+    # Stage 1: node-local gather (shared-memory fast path)
+    node_buf = None
+    if is_leader:
+        node_counts = np.empty(node_comm.Get_size(), dtype=np.int32)
+        node_comm.Gather(send_count, node_counts, root=0)
+        node_buf = np.empty(np.sum(node_counts), dtype=np.int64)
+        node_displs = np.concatenate(([0], np.cumsum(node_counts)[:-1]))
+        node_buf[:len(send_data)] = send_data
+        node_comm.Gatherv(MPI.IN_PLACE,
+                          [node_buf, node_counts, node_displs, MPI.INT64_T], root=0)
+    else:
+        node_comm.Gather(send_count, None, root=0)
+        node_comm.Gatherv([send_data, MPI.INT64_T], None, root=0)
+
+    # Stage 2: leaders -> global rank 0
     recv_buf = None
-    if rank == 0:
-        recv_buf = np.empty(np.sum(recv_counts), dtype=np.int64)
-    
-    displs = None
-    if rank == 0:
-        displs = np.concatenate(([0], np.cumsum(recv_counts)[:-1]))
-        
-    comm.Gatherv([send_data, MPI.INT64_T], [recv_buf, recv_counts, displs, MPI.INT64_T], root=0)
-    
+    if is_leader:
+        leader_count = np.array([len(node_buf)], dtype=np.int32)
+        if rank == 0:
+            leader_counts = np.empty(leaders_comm.Get_size(), dtype=np.int32)
+            leaders_comm.Gather(leader_count, leader_counts, root=0)
+            recv_buf = np.empty(np.sum(leader_counts), dtype=np.int64)
+            leader_displs = np.concatenate(([0], np.cumsum(leader_counts)[:-1]))
+            recv_buf[:len(node_buf)] = node_buf
+            leaders_comm.Gatherv(MPI.IN_PLACE,
+                                 [recv_buf, leader_counts, leader_displs, MPI.INT64_T],
+                                 root=0)
+        else:
+            leaders_comm.Gather(leader_count, None, root=0)
+            leaders_comm.Gatherv([node_buf, MPI.INT64_T], None, root=0)
+        leaders_comm.Free()
+    node_comm.Free()
+
     # 3. Solve Locally
     extra_matches = []
     if rank == 0:
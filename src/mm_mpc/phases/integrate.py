@@ -5,7 +5,7 @@ Phase 5: Integration. Removes edges incident to matched vertices.
 
 import numpy as np
 from mpi4py import MPI
-from ..state_layout import EdgeState
+from ..state_layout import EdgeState, ensure_owner_cache
 from ..utils import mpi_helpers, hashing
 
 def update_matching_and_prune(
@@ -14,87 +14,109 @@ def update_matching_and_prune(
     vertex_state: EdgeState,
     chosen_mask: np.ndarray,
     p_size: int
-) -> list:
+) -> tuple:
     """
-    Returns list of newly matched (u, v) tuples.
+    Returns (list of newly matched (u, v) tuples, number of edges pruned).
     Updates edge_state.active_mask to remove incident edges AND chosen edges.
+    The prune count lets the driver maintain its active-edge counter
+    without rescanning the mask every phase.
     """
     # 1. Identify newly matched edges
-    new_indices = np.where(chosen_mask)[0]
-    local_matches = []
-    
-    # Notify vertex owners: "Vertex V is matched"
-    match_notifs = [[] for _ in range(p_size)]
-    
-    for idx in new_indices:
-        u, v = edge_state.edges_local[idx]
-        local_matches.append((u, v))
-        
-        # Mark locally
-        edge_state.matched_edge[idx] = True
-        
-        # CRITICAL FIX: Chosen edges must leave the active set immediately
-        edge_state.active_mask[idx] = False 
-        
-        owner_u = hashing.get_vertex_owner(u, p_size)
-        owner_v = hashing.get_vertex_owner(v, p_size)
-        
-        match_notifs[owner_u].append(u)
-        match_notifs[owner_v].append(v)
-        
-    # Exchange 1: Notify Vertices
-    recv_matches = mpi_helpers.exchange_buffers(comm, match_notifs, dtype=np.int64)
-    
-    my_matched_verts = set()
-    for buf in recv_matches:
-        for v in buf:
-            # We own this vertex (guaranteed by routing), so we track it.
-            # Even if we don't have local edges incident to it, we must answer queries about it.
-            my_matched_verts.add(v)
-            
-    # 2. Filter Active Edges (The "Kill" Phase)
-    # Only check edges that are STILL active (i.e., not the ones we just chose)
-    active_indices = np.where(edge_state.active_mask)[0]
-    
-    query_bufs = [[] for _ in range(p_size)]
-    for idx in active_indices:
-        u, v = edge_state.edges_local[idx]
-        eid = edge_state.edge_ids[idx]
-        
-        owner_u = hashing.get_vertex_owner(u, p_size)
-        owner_v = hashing.get_vertex_owner(v, p_size)
-        
-        query_bufs[owner_u].extend([u, eid])
-        query_bufs[owner_v].extend([v, eid])
-        
-    # Exchange 2: Edges -> Vertices
-    recv_queries = mpi_helpers.exchange_buffers(comm, query_bufs, dtype=np.int64)
-    
-    # 3. Vertices Reply
-    reply_bufs = [[] for _ in range(p_size)]
-    for r_buf in recv_queries:
-        n = len(r_buf)
-        for k in range(0, n, 2):
-            target_v = r_buf[k]
-            source_eid = r_buf[k+1]
-            
-            if target_v in my_matched_verts:
-                # Reply "Kill" to edge owner
-                owner_e = hashing.get_edge_owner_from_id(source_eid, p_size)
-                reply_bufs[owner_e].append(source_eid)
-                
-    # Exchange 3: Vertices -> Edges
+    ensure_owner_cache(edge_state, p_size)
+    n_new = int(np.count_nonzero(chosen_mask))
+    local_matches = list(map(tuple, edge_state.edges_local[chosen_mask]))
+
+    # Mark locally. CRITICAL: chosen edges must leave the active set
+    # immediately.
+    edge_state.matched_edge[chosen_mask] = True
+    edge_state.active_mask[chosen_mask] = False
+
+    # Fused Exchange 1: match notifications and active-edge queries ride
+    # in one message per destination -- [n_match, matched_verts...,
+    # (v, eid) pairs...]. All buffers arrive before any is decoded, so
+    # every owner sees the full matched set before answering queries;
+    # this drops one collective round trip from the old
+    # notify / query / kill sequence.
+    n_verts = np.concatenate([edge_state.u[chosen_mask], edge_state.v[chosen_mask]])
+    n_owners = np.concatenate([edge_state.owner_u[chosen_mask],
+                               edge_state.owner_v[chosen_mask]])
+    order = np.argsort(n_owners, kind='stable')
+    sorted_nverts = n_verts[order]
+    n_bounds = np.concatenate(([0], np.cumsum(np.bincount(n_owners, minlength=p_size))))
+
+    # Queries from edges that are STILL active (not the ones just chosen)
+    active = edge_state.active_mask
+    q_verts = np.concatenate([edge_state.u[active], edge_state.v[active]])
+    q_eids = np.concatenate([edge_state.edge_ids[active], edge_state.edge_ids[active]])
+    q_owners = np.concatenate([edge_state.owner_u[active], edge_state.owner_v[active]])
+
+    order = np.argsort(q_owners, kind='stable')
+    payload = np.empty((len(order), 2), dtype=np.int64)
+    payload[:, 0] = q_verts[order]
+    payload[:, 1] = q_eids[order]
+    flat = payload.reshape(-1)
+    q_bounds = np.concatenate(([0], np.cumsum(2 * np.bincount(q_owners, minlength=p_size))))
+
+    send_bufs = []
+    for r in range(p_size):
+        notif = sorted_nverts[n_bounds[r]:n_bounds[r + 1]]
+        query = flat[q_bounds[r]:q_bounds[r + 1]]
+        buf = np.empty(1 + len(notif) + len(query), dtype=np.int64)
+        buf[0] = len(notif)
+        buf[1:1 + len(notif)] = notif
+        buf[1 + len(notif):] = query
+        send_bufs.append(buf)
+
+    recv_data = mpi_helpers.exchange_buffers(comm, send_bufs, dtype=np.int64)
+
+    # Pass 1: the matched set, from every sender's notification section.
+    # We own these vertices (guaranteed by routing), so we track them
+    # even without local incident edges.
+    notif_parts = []
+    query_parts = []
+    for r_buf in recv_data:
+        nm = int(r_buf[0])
+        notif_parts.append(r_buf[1:1 + nm])
+        query_parts.append(r_buf[1 + nm:])
+    matched_sorted = np.unique(np.concatenate(notif_parts)) if notif_parts \
+        else np.empty(0, dtype=np.int64)
+
+    # Pass 2: Vertices Reply. Membership against the sorted matched set
+    # is one searchsorted over all queries; the kill eids are then
+    # owner-bucketed with the usual argsort + bincount slicing -- no
+    # per-pair Python or set probes.
+    queries = (np.concatenate(query_parts) if query_parts
+               else np.empty(0, dtype=np.int64))
+    reply_bufs = [np.empty(0, dtype=np.int64) for _ in range(p_size)]
+    if len(queries) and len(matched_sorted):
+        q_pairs = queries.reshape(-1, 2)
+        pos = np.searchsorted(matched_sorted, q_pairs[:, 0])
+        safe = np.minimum(pos, len(matched_sorted) - 1)
+        hit = matched_sorted[safe] == q_pairs[:, 0]
+        kill_eids = q_pairs[hit, 1]
+
+        dests = hashing.get_edge_owner_from_id_vec(kill_eids, p_size)
+        order = np.argsort(dests, kind='stable')
+        kill_sorted = kill_eids[order]
+        k_bounds = np.concatenate(([0], np.cumsum(np.bincount(dests, minlength=p_size))))
+        reply_bufs = [kill_sorted[k_bounds[r]:k_bounds[r + 1]] for r in range(p_size)]
+
+    # Exchange 2: Vertices -> Edges
     recv_kills = mpi_helpers.exchange_buffers(comm, reply_bufs, dtype=np.int64)
     
     # 4. Apply Deletions
-    lookup = edge_state.id_to_index
+    # One searchsorted resolves every kill eid to its local row; an edge
+    # killed through both endpoints dedups via np.unique so it is only
+    # counted once.
     kill_count = 0
-    for k_buf in recv_kills:
-        for eid in k_buf:
-            if eid in lookup:
-                idx = lookup[eid]
-                if edge_state.active_mask[idx]:
-                    edge_state.active_mask[idx] = False
-                    kill_count += 1
-    
-    return local_matches
\ No newline at end of file
+    kills = np.concatenate(recv_kills) if recv_kills else np.empty(0, dtype=np.int64)
+    if len(kills):
+        eids_sorted = edge_state.eids_sorted
+        pos = np.searchsorted(eids_sorted, kills)
+        safe = np.minimum(pos, max(len(eids_sorted) - 1, 0))
+        valid = (pos < len(eids_sorted)) & (eids_sorted[safe] == kills)
+        targets = np.unique(edge_state.sorted_to_local[pos[valid]])
+        kill_count = int(np.count_nonzero(edge_state.active_mask[targets]))
+        edge_state.active_mask[targets] = False
+
+    return local_matches, n_new + kill_count
\ No newline at end of file
@@ -14,11 +14,9 @@ def to_uint64(val: int) -> np.uint64:
     return np.uint64(val & MASK_64)
 
 def assign_priorities(edge_state: EdgeState, phase: int):
-    m = len(edge_state.edges_local)
-    for i in range(m):
-        if edge_state.active_mask[i]:
-            raw = hashing.hash64(edge_state.edge_ids[i], 0, phase, 0, "priority")
-            edge_state.priority[i] = to_uint64(raw)
+    mask = edge_state.active_mask
+    raw = hashing.hash64_vec(edge_state.edge_ids[mask], 0, phase, 0, "priority")
+    edge_state.priority[mask] = raw.view(np.uint64)
 
 def run_greedy_mis(
     edge_state: EdgeState, 
@@ -41,37 +39,41 @@ def run_greedy_mis(
     if participating_mask is not None:
         candidates_mask &= participating_mask
         
-    candidate_indices = np.where(candidates_mask)[0]
-    
-    for idx in candidate_indices:
-        my_eid = edge_state.edge_ids[idx]
-        my_prio = to_uint64(hashing.hash64(my_eid, 0, phase, 0, "priority"))
-        
-        is_local_max = True
-        
-        start = edge_state.ball_offsets[idx]
-        end = edge_state.ball_offsets[idx+1]
-        
-        # If ball is empty (isolated in H_s), it's a local max
-        if start == end:
-            chosen[idx] = True
-            continue
-            
-        ball_eids = edge_state.ball_storage[start:end]
-        
-        for n_eid in ball_eids:
-            if n_eid == my_eid:
-                continue
-                
-            # Check neighbor priority
-            n_prio = to_uint64(hashing.hash64(n_eid, 0, phase, 0, "priority"))
-            
-            if n_prio > my_prio:
-                is_local_max = False; break
-            elif n_prio == my_prio and n_eid > my_eid:
-                is_local_max = False; break
-        
-        if is_local_max:
-            chosen[idx] = True
-            
+    candidate_indices = np.flatnonzero(candidates_mask)
+
+    # Hash everything up front: one vectorized pass over the candidate
+    # eids and one over the whole ball storage, instead of re-hashing
+    # per neighbor comparison inside a Python loop.
+    my_eids = edge_state.edge_ids[candidate_indices]
+    my_prios = hashing.hash64_vec(my_eids, 0, phase, 0, "priority").view(np.uint64)
+    # Neighbors recur across balls, so hash each distinct eid once and
+    # broadcast back through the inverse map instead of hashing every
+    # storage slot.
+    ball_eids_all = edge_state.ball_storage
+    uniq_eids, inv = np.unique(ball_eids_all, return_inverse=True)
+    ball_prios = hashing.hash64_vec(uniq_eids, 0, phase, 0, "priority").view(np.uint64)[inv]
+    offsets = edge_state.ball_offsets
+
+    # Segmented compare with no per-candidate Python: expand every
+    # candidate's ball segment into one flat position array (tags map
+    # each element back to its candidate), do the lexicographic
+    # (priority, eid) compare across all segments in one pass, and fold
+    # per-candidate with a bincount. The candidate's own entry never
+    # beats itself, and an empty ball (isolated in H_s) folds to
+    # "unbeaten", i.e. a local max.
+    n_cand = len(candidate_indices)
+    starts = offsets[candidate_indices]
+    lens = offsets[candidate_indices + 1] - starts
+    tags = np.repeat(np.arange(n_cand), lens)
+    base = np.cumsum(lens) - lens
+    pos = np.arange(int(lens.sum()), dtype=np.int64) - base[tags] + starts[tags]
+
+    my_p = my_prios[tags]
+    my_e = my_eids[tags]
+    seg_p = ball_prios[pos]
+    seg_e = ball_eids_all[pos]
+    beaten_elem = (seg_p > my_p) | ((seg_p == my_p) & (seg_e > my_e))
+    beaten = np.bincount(tags, weights=beaten_elem, minlength=n_cand) > 0
+    chosen[candidate_indices] = ~beaten
+
     return chosen
\ No newline at end of file
@@ -1,96 +1,103 @@
 import numpy as np
 from mpi4py import MPI
-from collections import defaultdict
-from ..state_layout import EdgeState
+from ..state_layout import EdgeState, ensure_owner_cache
 from ..utils import hashing, mpi_helpers
 
-def compute_phase_participation(edge_state: EdgeState, phase: int, iteration: int, p_val: float) -> np.ndarray:
-    m = len(edge_state.edges_local)
-    participating = np.zeros(m, dtype=bool)
-    
-    # abs(signed_hash) compared against max_int64 * p
-    limit = int(p_val * 9223372036854775807) 
-    
-    eids = edge_state.edge_ids
-    active = edge_state.active_mask
-    stalled = edge_state.stalled
-    
-    for i in range(m):
-        if active[i] and not stalled[i]:
-            h = hashing.hash64(eids[i], 0, phase, iteration, "sample")
-            if abs(h) <= limit:
-                participating[i] = True
-    return participating
+def compute_phase_participation(edge_state: EdgeState, phase: int, iteration: int, p_val: float,
+                                use_bit_sampling: bool = False) -> np.ndarray:
+    h = hashing.hash64_vec(edge_state.edge_ids, 0, phase, iteration, "sample")
+
+    if use_bit_sampling and 0.0 < p_val < 1.0:
+        # Quantized sampling: round p to the nearest 2^-k and keep edges
+        # whose k low hash bits are zero -- one AND + compare, no abs.
+        # The rate is off by at most a factor of sqrt(2) from p_val.
+        k = max(1, int(round(-np.log2(p_val))))
+        keep_mask = np.int64((1 << k) - 1)
+        return edge_state.active_mask & ~edge_state.stalled & ((h & keep_mask) == 0)
+
+    # Exact path: abs(signed_hash) compared against max_int64 * p.
+    limit = np.uint64(int(p_val * 9223372036854775807))
+
+    # One vectorized hash pass over all edge ids (same stream as the old
+    # per-edge hash64 loop), masked down to active, non-stalled edges.
+    # Magnitude is taken in uint64 so abs(-2^63) stays 2^63, matching
+    # Python abs() in the scalar path.
+    u = h.view(np.uint64)
+    mag = np.where(h >= 0, u, (~u) + np.uint64(1))
+    return edge_state.active_mask & ~edge_state.stalled & (mag <= limit)
 
 def compute_deg_in_sparse(comm: MPI.Comm, edge_state: EdgeState, vertex_state: EdgeState, participating_mask: np.ndarray, p_size: int):
     # Note: vertex_state type hint is actually VertexState but we avoid circular import or just use Any
     edge_state.deg_in_sparse[:] = 0
-    local_indices = np.where(participating_mask)[0]
-    
+    ensure_owner_cache(edge_state, p_size)
+
     # 1. Edge -> Vertex
-    active_edges = edge_state.edges_local[local_indices]
-    active_eids = edge_state.edge_ids[local_indices]
-    send_bufs = [[] for _ in range(p_size)]
-    
-    for i in range(len(local_indices)):
-        u, v = active_edges[i]
-        eid = active_eids[i]
-        send_bufs[hashing.get_vertex_owner(u, p_size)].extend([u, eid])
-        send_bufs[hashing.get_vertex_owner(v, p_size)].extend([v, eid])
-        
+    # Vectorized packing: both endpoints' (vertex, eid) pairs are
+    # bucketed by owner with one stable argsort; per-rank buffers are
+    # contiguous slices of the sorted payload.
+    u = edge_state.u[participating_mask]
+    v = edge_state.v[participating_mask]
+    eids = edge_state.edge_ids[participating_mask]
+
+    verts = np.concatenate([u, v])
+    pair_eids = np.concatenate([eids, eids])
+    owners = np.concatenate([edge_state.owner_u[participating_mask],
+                             edge_state.owner_v[participating_mask]])
+
+    order = np.argsort(owners, kind='stable')
+    payload = np.empty((len(order), 2), dtype=np.int64)
+    payload[:, 0] = verts[order]
+    payload[:, 1] = pair_eids[order]
+    flat = payload.reshape(-1)
+
+    counts = np.bincount(owners, minlength=p_size)
+    bounds = np.concatenate(([0], np.cumsum(2 * counts)))
+    send_bufs = [flat[bounds[r]:bounds[r + 1]] for r in range(p_size)]
+
     recv_lists = mpi_helpers.exchange_buffers(comm, send_bufs, dtype=np.int64)
     
-    # 2. Vertex Count (Using VertexState)
-    # We need to map incoming 'v' to local row index to store counts?
-    # Actually, for just counting, we can use a temporary array aligned with vertex_ids
-    # But since we need to reply to specific EIDs, we just need to know the count for 'v'.
-    # We can use vertex_state.vertex_id_to_row to validate ownership and (if needed) store state.
-    # For this phase, we just need the count.
-    
-    # We can use a dict for the *current phase* counts, or a dense array if we trust vertex_ids.
-    # Let's use a dict for now to be safe, but populated only for owned vertices.
-    # Wait, the requirement is to avoid python objects for *adjacency*. 
-    # Temporary dicts for message processing are okay if they don't persist or explode.
-    # But let's try to use the dense array approach if possible.
-    
-    n_local = len(vertex_state.vertex_ids)
-    # We can't easily index by 'v' directly if v is arbitrary 64-bit.
-    # We MUST use vertex_id_to_row.
-    
-    # 2. Vertex Count
-    # We use a defaultdict to count degrees for ALL owned vertices (including ghosts).
-    # This is a temporary structure for the phase, so it's allowed.
-    v_counts = defaultdict(int)
-    v_requests = defaultdict(list)
-    
-    # Pass 1: Aggregate
-    for r_data in recv_lists:
-        n = len(r_data)
-        for k in range(0, n, 2):
-            v, eid = r_data[k], r_data[k+1]
-            # We own v (guaranteed by routing), so we count it.
-            v_counts[v] += 1
-            v_requests[v].append(eid)
-            
-    # 3. Reply to Edge
-    reply_bufs = [[] for _ in range(p_size)]
-    for v, eids in v_requests.items():
-        count = v_counts[v]
-        for eid in eids:
-            dest = hashing.get_edge_owner_from_id(eid, p_size)
-            reply_bufs[dest].extend([eid, count])
-            
+    # 2 + 3. Vertex Count and Reply, fully vectorized
+    # Each incoming (v, eid) pair gets exactly one reply (eid, count_v),
+    # so there is no need to group requests per vertex: np.unique with
+    # return_inverse gives every pair its vertex's multiplicity in one
+    # pass, and the replies are owner-bucketed with the same argsort +
+    # bincount idiom as the send side -- no defaultdicts, no per-pair
+    # Python.
+    incoming = (np.concatenate(recv_lists) if recv_lists
+                else np.empty(0, dtype=np.int64))
+    reply_bufs = [np.empty(0, dtype=np.int64) for _ in range(p_size)]
+    if len(incoming):
+        req_pairs = incoming.reshape(-1, 2)
+        req_eids = req_pairs[:, 1]
+        _, inv, v_counts = np.unique(req_pairs[:, 0],
+                                     return_inverse=True, return_counts=True)
+        per_pair_count = v_counts[inv]
+
+        dests = hashing.get_edge_owner_from_id_vec(req_eids, p_size)
+        order = np.argsort(dests, kind='stable')
+        reply_payload = np.empty((len(order), 2), dtype=np.int64)
+        reply_payload[:, 0] = req_eids[order]
+        reply_payload[:, 1] = per_pair_count[order]
+        reply_flat = reply_payload.reshape(-1)
+        r_bounds = np.concatenate(([0], np.cumsum(2 * np.bincount(dests, minlength=p_size))))
+        reply_bufs = [reply_flat[r_bounds[r]:r_bounds[r + 1]] for r in range(p_size)]
+
     recv_replies = mpi_helpers.exchange_buffers(comm, reply_bufs, dtype=np.int64)
     
     # 4. Update
-    lookup = edge_state.id_to_index
-    accumulators = defaultdict(int)
-    for r_data in recv_replies:
-        n = len(r_data)
-        for k in range(0, n, 2):
-            eid, count = r_data[k], r_data[k+1]
-            if eid in lookup:
-                accumulators[lookup[eid]] += count
-                
-    for idx, total in accumulators.items():
-        edge_state.deg_in_sparse[idx] = max(0, total - 2)
\ No newline at end of file
+    # Resolve all reply eids to local rows with one searchsorted and
+    # accumulate the per-edge counts with a scatter-add -- no dict
+    # probes per pair.
+    replies = np.concatenate(recv_replies) if recv_replies else np.empty(0, dtype=np.int64)
+    if len(replies):
+        pairs = replies.reshape(-1, 2)
+        eids_sorted = edge_state.eids_sorted
+        pos = np.searchsorted(eids_sorted, pairs[:, 0])
+        safe = np.minimum(pos, max(len(eids_sorted) - 1, 0))
+        valid = (pos < len(eids_sorted)) & (eids_sorted[safe] == pairs[:, 0])
+        idxs = edge_state.sorted_to_local[pos[valid]]
+
+        totals = np.zeros(len(edge_state.edge_ids), dtype=np.int64)
+        np.add.at(totals, idxs, pairs[valid, 1])
+        touched = np.unique(idxs)
+        edge_state.deg_in_sparse[touched] = np.maximum(0, totals[touched] - 2)
\ No newline at end of file
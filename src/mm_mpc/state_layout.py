@@ -1,10 +1,12 @@
 import numpy as np
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Optional
 
 @dataclass
 class EdgeState:
     edges_local: np.ndarray    # (m, 2) int64
+    u: np.ndarray              # (m,) int64, contiguous column copy (SoA)
+    v: np.ndarray              # (m,) int64, contiguous column copy (SoA)
     edge_ids: np.ndarray       # (m,) int64
     active_mask: np.ndarray    # (m,) bool
     deg_in_sparse: np.ndarray  # (m,) int32
@@ -14,6 +16,16 @@ class EdgeState:
     ball_storage: np.ndarray   # flat int64
     id_to_index: Dict[int, int]
     matched_edge: np.ndarray   # (m,) bool
+    # Sorted-id index: searchsorted over eids_sorted plus a gather from
+    # sorted_to_local resolves whole arrays of incoming eids to local
+    # rows, replacing per-element id_to_index probes on hot paths.
+    eids_sorted: np.ndarray    # (m,) int64, sorted copy of edge_ids
+    sorted_to_local: np.ndarray  # (m,) int64, local row per sorted slot
+    # Vertex-owner ranks per endpoint; hash results never change, so
+    # they are computed once on first use (needs comm size) and reused
+    # across every phase and R-round.
+    owner_u: Optional[np.ndarray] = None   # (m,) int32
+    owner_v: Optional[np.ndarray] = None   # (m,) int32
 
 @dataclass
 class VertexState:
@@ -25,9 +37,17 @@ class VertexState:
 def init_edge_state(edges_np: np.ndarray, global_ids: np.ndarray) -> EdgeState:
     m = len(edges_np)
     id_map = {gid: i for i, gid in enumerate(global_ids)}
-    
+    sorted_to_local = np.argsort(global_ids, kind='stable')
+
+    edges = edges_np.astype(np.int64)
+    # Stride-1 endpoint columns: vectorized owner/hash passes scan these
+    # instead of striding through the (m, 2) row-major table.
+    edges_2d = edges.reshape(m, 2)
+
     return EdgeState(
-        edges_local=edges_np.astype(np.int64),
+        edges_local=edges_2d,
+        u=np.ascontiguousarray(edges_2d[:, 0]),
+        v=np.ascontiguousarray(edges_2d[:, 1]),
         edge_ids=global_ids.astype(np.int64),
         active_mask=np.ones(m, dtype=bool),
         deg_in_sparse=np.zeros(m, dtype=np.int32),
@@ -36,9 +56,19 @@ def init_edge_state(edges_np: np.ndarray, global_ids: np.ndarray) -> EdgeState:
         ball_offsets=np.zeros(m + 1, dtype=np.int64),
         ball_storage=np.array([], dtype=np.int64),
         id_to_index=id_map,
-        matched_edge=np.zeros(m, dtype=bool)
+        matched_edge=np.zeros(m, dtype=bool),
+        eids_sorted=global_ids.astype(np.int64)[sorted_to_local],
+        sorted_to_local=sorted_to_local
     )
 
+def ensure_owner_cache(edge_state: EdgeState, p_size: int):
+    """Fills the per-endpoint owner arrays on first use (the comm size
+    is not known at init time)."""
+    from .utils import hashing
+    if edge_state.owner_u is None:
+        edge_state.owner_u = hashing.get_vertex_owner_vec(edge_state.u, p_size)
+        edge_state.owner_v = hashing.get_vertex_owner_vec(edge_state.v, p_size)
+
 def init_vertex_state(comm, edge_state: EdgeState) -> VertexState:
     from .utils import hashing
     rank = comm.Get_rank()
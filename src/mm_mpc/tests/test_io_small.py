@@ -0,0 +1,60 @@
+"""
+tests/test_io_small.py
+Regression tests for the parallel text loader's byte slicing on inputs
+smaller than (or comparable to) the rank count: empty files, a single
+edge without a trailing newline, and slices that fall entirely inside
+one line. The slicing helpers are pure, so arbitrary rank counts are
+simulated without launching MPI.
+"""
+import io
+import numpy as np
+from mm_mpc.graph_io import _slice_bounds, _trim_owned_lines
+
+def _simulate(raw: bytes, size: int) -> list:
+    """Applies every simulated rank's window + trim to the same bytes,
+    mirroring what _load_parallel_text does after the collective read."""
+    parts = []
+    for rank in range(size):
+        base, start, end, read_end = _slice_bounds(len(raw), rank, size)
+        assert 0 <= base <= read_end, "negative or inverted read window"
+        parts.append(_trim_owned_lines(raw[base:read_end], base, start, end))
+    return parts
+
+def _parse(data: bytes) -> np.ndarray:
+    if not data.strip():
+        return np.empty((0, 2), dtype=np.int64)
+    return np.loadtxt(io.BytesIO(data), dtype=np.int64, comments='#',
+                      usecols=(0, 1), ndmin=2)
+
+def test_empty_file():
+    for size in (1, 2, 4, 16):
+        parts = _simulate(b"", size)
+        assert all(p == b"" for p in parts)
+
+def test_single_edge_no_trailing_newline():
+    # 3 bytes across many ranks: chunk is 0, every slice starts at 0,
+    # and exactly one rank may own the line.
+    raw = b"0 1"
+    for size in (1, 2, 4, 16):
+        parts = _simulate(raw, size)
+        assert b"".join(parts) == raw, f"gap or overlap at size {size}"
+        total = np.vstack([_parse(p) for p in parts])
+        np.testing.assert_array_equal(total, [[0, 1]])
+
+def test_line_spanning_slices():
+    # 22-byte lines: at high rank counts a slice falls entirely inside
+    # one line, the case that used to duplicate the boundary edge.
+    edges = [(10**9 + i, 2 * 10**9 + i) for i in range(10)]
+    raw = "".join(f"{u:10d} {v:10d}\n" for u, v in edges).encode()
+    reference = _parse(raw)
+    for size in (1, 3, 7, 12, 16, 64):
+        parts = _simulate(raw, size)
+        assert b"".join(parts) == raw, f"gap or overlap at size {size}"
+        total = np.vstack([_parse(p) for p in parts])
+        np.testing.assert_array_equal(total, reference)
+
+if __name__ == "__main__":
+    test_empty_file()
+    test_single_edge_no_trailing_newline()
+    test_line_spanning_slices()
+    print("Small-file IO Tests: PASSED")
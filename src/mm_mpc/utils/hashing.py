@@ -1,45 +1,139 @@
 import struct
 import hashlib
+import functools
+import numpy as np
 
 _GLOBAL_SEED = 0
 
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+# splitmix64 mixing constants
+_SM_GAMMA = 0x9E3779B97F4A7C15
+_SM_MUL1 = 0xBF58476D1CE4E5B9
+_SM_MUL2 = 0x94D049BB133111EB
+
+_SALT_CACHE = {}
+
 def init_seed(seed: int):
     global _GLOBAL_SEED
     _GLOBAL_SEED = seed
+    # Memoized owners depend on the seed; drop them on re-seed
+    get_edge_owner.cache_clear()
+
+def _salt_const(salt: str) -> int:
+    """Folds a salt string into a fixed 64-bit constant (cached)."""
+    c = _SALT_CACHE.get(salt)
+    if c is None:
+        c = struct.unpack("Q", hashlib.sha1(salt.encode('ascii')).digest()[:8])[0]
+        _SALT_CACHE[salt] = c
+    return c
+
+def _mix(x: int) -> int:
+    """splitmix64 finalizer on a 64-bit word (Python int path)."""
+    z = (x + _SM_GAMMA) & _MASK_64
+    z = ((z ^ (z >> 30)) * _SM_MUL1) & _MASK_64
+    z = ((z ^ (z >> 27)) * _SM_MUL2) & _MASK_64
+    return z ^ (z >> 31)
+
+def _mix_vec(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer over a uint64 array. Bit-identical to _mix."""
+    z = x + np.uint64(_SM_GAMMA)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(_SM_MUL1)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(_SM_MUL2)
+    return z ^ (z >> np.uint64(31))
 
 def hash64(u: int, v: int = 0, phase: int = 0, iteration: int = 0, salt: str = "") -> int:
     """
     Returns a SIGNED 64-bit integer (-2^63 to 2^63-1).
     Consistent with numpy.int64 and MPI.INT64_T.
+
+    Implemented as a splitmix64 chain so hash64_vec can reproduce the
+    exact same stream over whole NumPy arrays without per-element
+    Python dispatch.
     """
+    # Normalize to Python ints: callers pass np.int64 scalars out of
+    # arrays, and mixed numpy/bigint arithmetic would not wrap at 64 bits.
+    u = int(u)
+    v = int(v)
+    phase = int(phase)
+    iteration = int(iteration)
+
     low = u if u < v else v
     high = v if u < v else u
-    
-    # Q = unsigned 8 bytes, q = signed 8 bytes
-    # u, v can be IDs which might be large/negative, so use 'q'
-    data = struct.pack("QqqQQ", _GLOBAL_SEED, low, high, phase, iteration)
-    
+
+    z = _mix(_GLOBAL_SEED ^ (low & _MASK_64))
+    z = _mix(z ^ (high & _MASK_64))
+    z = _mix(z ^ (phase & _MASK_64))
+    z = _mix(z ^ (iteration & _MASK_64))
+    if salt:
+        z = _mix(z ^ _salt_const(salt))
+
+    # Reinterpret the unsigned word as signed int64
+    return z - (1 << 64) if z >= (1 << 63) else z
+
+def hash64_vec(u, v=0, phase: int = 0, iteration: int = 0, salt: str = "") -> np.ndarray:
+    """
+    Vectorized hash64 over int64 arrays; bit-identical to the scalar path.
+    `v` may be an array or a scalar broadcast against `u`.
+    """
+    u = np.ascontiguousarray(u, dtype=np.int64)
+    v = np.ascontiguousarray(np.broadcast_to(np.asarray(v, dtype=np.int64), u.shape))
+
+    # Signed min/max matches the scalar `u < v` ordering; the uint64
+    # view is the same two's-complement reinterpretation `& _MASK_64` does.
+    low = np.minimum(u, v).view(np.uint64)
+    high = np.maximum(u, v).view(np.uint64)
+
+    z = _mix_vec(np.uint64(_GLOBAL_SEED & _MASK_64) ^ low)
+    z = _mix_vec(z ^ high)
+    z = _mix_vec(z ^ np.uint64(phase & _MASK_64))
+    z = _mix_vec(z ^ np.uint64(iteration & _MASK_64))
     if salt:
-        data += salt.encode('ascii')
-        
-    h = hashlib.sha1(data).digest()
-    # Unpack as signed 'q' to fit in standard numpy int64
-    return struct.unpack("q", h[:8])[0]
+        z = _mix_vec(z ^ np.uint64(_salt_const(salt)))
+
+    return z.view(np.int64)
+
+def _abs_mod_vec(h: np.ndarray, p_size: int) -> np.ndarray:
+    """abs(h) % p_size with Python int semantics (abs(-2^63) == 2^63)."""
+    u = h.view(np.uint64)
+    mag = np.where(h >= 0, u, (~u) + np.uint64(1))
+    return (mag % np.uint64(p_size)).astype(np.int32)
 
 def get_vertex_owner(v: int, p_size: int) -> int:
     h = hash64(v, 0, 0, 0, "vertex_owner")
     return abs(h) % p_size
 
+def get_vertex_owner_vec(v, p_size: int) -> np.ndarray:
+    """Vectorized get_vertex_owner over an int64 id array."""
+    return _abs_mod_vec(hash64_vec(v, 0, 0, 0, "vertex_owner"), p_size)
+
 def get_edge_id(u: int, v: int) -> int:
     """Canonical Global ID (Signed)."""
     return hash64(u, v, 0, 0, "eid")
 
+def get_edge_id_vec(u, v) -> np.ndarray:
+    """Vectorized get_edge_id over int64 endpoint arrays."""
+    return hash64_vec(u, v, 0, 0, "eid")
+
 def get_edge_owner_from_id(eid: int, p_size: int) -> int:
     """Canonical Owner logic based ONLY on Global ID."""
     h = hash64(eid, 0, 0, 0, "edge_owner")
     return abs(h) % p_size
 
+def get_edge_owner_from_id_vec(eids, p_size: int) -> np.ndarray:
+    """Vectorized get_edge_owner_from_id over an int64 id array."""
+    return _abs_mod_vec(hash64_vec(eids, 0, 0, 0, "edge_owner"), p_size)
+
+@functools.lru_cache(maxsize=1 << 20)
 def get_edge_owner(u: int, v: int, p_size: int) -> int:
-    """Consistent helper for loading."""
+    """Consistent helper for loading.
+
+    Memoized: repeated (u, v) queries (tests, scalar fallback paths)
+    become a dict lookup. Bulk callers should prefer get_edge_owner_vec.
+    """
     eid = get_edge_id(u, v)
-    return get_edge_owner_from_id(eid, p_size)
\ No newline at end of file
+    return get_edge_owner_from_id(eid, p_size)
+
+def get_edge_owner_vec(u, v, p_size: int) -> np.ndarray:
+    """Vectorized get_edge_owner over int64 endpoint arrays."""
+    return get_edge_owner_from_id_vec(get_edge_id_vec(u, v), p_size)
@@ -10,11 +10,41 @@ from typing import List, Any
 
 # Chunk size constant: 256 MB
 # This is small enough to fit in L3 cache/RAM easily, but large enough to saturate bandwidth.
-MAX_CHUNK_BYTES = 256 * 1024 * 1024 
+MAX_CHUNK_BYTES = 256 * 1024 * 1024
+
+class _BufferPool:
+    """
+    Free-list of reusable NumPy scratch buffers for MPI exchanges.
+    Capacities are rounded up to powers of two so successive phases with
+    slightly different payload sizes hit the same slot instead of
+    reallocating every chunk iteration.
+    """
+    def __init__(self):
+        self._free = {}
+
+    def get(self, count: int, dtype=np.int64) -> np.ndarray:
+        count = int(count)
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        cap = 1 << (count - 1).bit_length()
+        key = (np.dtype(dtype).str, cap)
+        stack = self._free.get(key)
+        base = stack.pop() if stack else np.empty(cap, dtype=dtype)
+        return base[:count]
+
+    def release(self, buf: np.ndarray):
+        base = buf.base if buf.base is not None else buf
+        if base.size == 0:
+            return
+        key = (base.dtype.str, base.size)
+        self._free.setdefault(key, []).append(base)
+
+# Module-level pool shared by all exchanges in the process
+pool = _BufferPool()
 
 def exchange_buffers(
-    comm: MPI.Comm, 
-    send_buffers: List[List[Any]], 
+    comm: MPI.Comm,
+    send_buffers: List[Any],
     dtype=np.int64,
     tracker=None
 ) -> List[np.ndarray]:
@@ -28,7 +58,8 @@ def exchange_buffers(
     
     Args:
         comm: MPI Communicator
-        send_buffers: List of lists (data to send to each rank)
+        send_buffers: Per-destination payloads; int64 ndarrays (or
+            views/slices) on the hot paths, plain lists still accepted
         dtype: Numpy data type
         tracker: Optional MetricsTracker for observability
         
@@ -59,7 +90,9 @@ def exchange_buffers(
     # If send_buffers is HUGE, this line itself is the OOM risk.
     # However, 'stalling' should keep send_buffers <= O(S).
     if total_send_elements > 0:
-        flat_send_data = np.concatenate([np.array(b, dtype=dtype) for b in send_buffers])
+        # np.asarray is a no-copy passthrough for the ndarray payloads
+        # the phases now produce; only plain-list callers pay a convert.
+        flat_send_data = np.concatenate([np.asarray(b, dtype=dtype) for b in send_buffers])
     else:
         flat_send_data = np.array([], dtype=dtype)
 
@@ -91,6 +124,27 @@ def exchange_buffers(
     if dtype == np.uint64: mpi_type = MPI.UINT64_T
     if dtype == np.float64: mpi_type = MPI.DOUBLE
 
+    # One transfer kept in flight: while chunk k is on the wire
+    # (Ialltoallv), chunk k-1 is unpacked and chunk k+1 is built, hiding
+    # the copy-out and serialization cost behind communication.
+    inflight = None
+
+    def _drain(entry):
+        req, f_send, f_recv, r_counts = entry
+        req.Wait()
+        cursor = 0
+        for src in range(size):
+            count = r_counts[src]
+            if count > 0:
+                # Write into pre-allocated final buffer
+                start_idx = recv_cursors[src]
+                recv_buffers[src][start_idx : start_idx + count] = f_recv[cursor : cursor + count]
+                recv_cursors[src] += count
+                cursor += count
+        # Scratch arrays go back to the pool for the next chunk/phase
+        pool.release(f_send)
+        pool.release(f_recv)
+
     while True:
         # A. Determine Payload for this Micro-Step
         # Each rank calculates how much it can send to every other rank 
@@ -121,15 +175,18 @@ def exchange_buffers(
         
         # B. Global Termination Check
         # If NOBODY has anything left to send, we are done.
-        any_active = comm.allreduce(active_sender, op=MPI.MAX)
-        if not any_active:
+        # (Buffered Allreduce -- the pickle form costs ~4x on tiny payloads.)
+        _active_send = np.array([active_sender], dtype=np.int32)
+        _active_recv = np.empty(1, dtype=np.int32)
+        comm.Allreduce(_active_send, _active_recv, op=MPI.MAX)
+        if not _active_recv[0]:
             break
             
-        # C. Prepare MPI Payloads
-        if len(send_chunks) > 0:
-            flat_chunk_send = np.concatenate(send_chunks)
-        else:
-            flat_chunk_send = np.array([], dtype=dtype)
+        # C. Prepare MPI Payloads (scratch buffers come from the pool)
+        total_chunk_send = int(np.sum(current_send_counts))
+        flat_chunk_send = pool.get(total_chunk_send, dtype=dtype)
+        if total_chunk_send > 0:
+            np.concatenate(send_chunks, out=flat_chunk_send)
             
         # Displacements for this specific Alltoallv call
         chunk_send_displs = np.concatenate(([0], np.cumsum(current_send_counts)[:-1])).astype(np.int32)
@@ -141,28 +198,24 @@ def exchange_buffers(
         
         # E. Receive Buffer for Chunk
         total_chunk_recv = np.sum(current_recv_counts)
-        flat_chunk_recv = np.empty(total_chunk_recv, dtype=dtype)
+        flat_chunk_recv = pool.get(total_chunk_recv, dtype=dtype)
         chunk_recv_displs = np.concatenate(([0], np.cumsum(current_recv_counts)[:-1])).astype(np.int32)
         
-        # F. The Physical Transfer
-        comm.Alltoallv(
+        # F. The Physical Transfer (nonblocking; unpacked by _drain once
+        # the next chunk has been posted)
+        req = comm.Ialltoallv(
             [flat_chunk_send, current_send_counts, chunk_send_displs, mpi_type],
             [flat_chunk_recv, current_recv_counts, chunk_recv_displs, mpi_type]
         )
-        
-        # G. Unpack / Reconstruction
-        # Copy the received chunk data into the correct positions in the final buffers
-        cursor = 0
-        for src in range(size):
-            count = current_recv_counts[src]
-            if count > 0:
-                data = flat_chunk_recv[cursor : cursor+count]
-                
-                # Write into pre-allocated final buffer
-                start_idx = recv_cursors[src]
-                recv_buffers[src][start_idx : start_idx+count] = data
-                
-                recv_cursors[src] += count
-                cursor += count
-                
+
+        # G. Pipeline Step: unpack the previous chunk while this one is
+        # still on the wire.
+        prev, inflight = inflight, (req, flat_chunk_send, flat_chunk_recv, current_recv_counts)
+        if prev is not None:
+            _drain(prev)
+
+    # Drain the last in-flight transfer
+    if inflight is not None:
+        _drain(inflight)
+
     return recv_buffers
\ No newline at end of file